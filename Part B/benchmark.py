@@ -0,0 +1,110 @@
+import contextlib
+import io
+import os
+import random
+import tempfile
+import sys
+import time
+
+with contextlib.redirect_stdout(io.StringIO()):  # The Q files print their examples on import
+    import Q1
+    import Q3
+    import Q4
+    import Q6
+    import Q8
+
+import functional_utils
+import prime_sieve
+import streaming
+from operator import add
+
+
+def time_call(function, *args, repeat=3):
+    """Return the best wall-clock time of calling a function."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark_primes():
+    """Compare Q8's trial division with the sieve-backed prime_desc."""
+    random.seed(0)
+    variants = [
+        ('Q8 trial division', Q8.prime_desc, 10 ** 5),  # Too slow for larger inputs
+        ('sieve (bytearray)', prime_sieve.prime_desc_bytearray, 10 ** 7),
+    ]
+    if prime_sieve.np is not None:
+        variants.append(('sieve (numpy)', prime_sieve.prime_desc_numpy, 10 ** 7))
+    for size in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7):
+        nums = [random.randint(0, size) for _ in range(size)]
+        print(f'{size} numbers up to {size}')
+        for name, prime_desc, max_size in variants:
+            if size <= max_size:
+                print(f'  {name:<20} {time_call(prime_desc, nums, repeat=1 if size >= 10 ** 6 else 3) * 1000:10.2f} ms')
+
+
+def benchmark_folds():
+    """Compare Q1/Q4's slicing recursion with the folds and generators in functional_utils."""
+    sizes = (10 ** 2, 5 * 10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+    recursion_limit = 500  # Q1 and Q4 overflow the stack not far above this
+    variants = [
+        ('sum: Q4 cumulative_operation', lambda n: Q4.cumulative_operation(add)(list(range(n))), recursion_limit),
+        ('sum: fold_right', lambda n: functional_utils.fold_right(add)(range(n)), 10 ** 6),
+        ('factorial: Q4', Q4.factorial, recursion_limit),
+        ('factorial: fold_left', lambda n: functional_utils.fold_left(lambda x, y: x * y)(range(1, n + 1)), 10 ** 5),
+        ('factorial: fold_tree', functional_utils.factorial, 10 ** 6),
+        ('fibonacci list: Q1', Q1.fibonacci, recursion_limit),
+        ('fibonacci list: generator', functional_utils.fibonacci, 10 ** 5),
+        ('F(n): fast doubling', functional_utils.fibonacci_number, 10 ** 6),
+    ]
+    for size in sizes:
+        print(f'n = {size}')
+        for name, function, max_size in variants:
+            if size <= max_size:
+                print(f'  {name:<30} {time_call(function, size, repeat=1 if size >= 10 ** 5 else 3) * 1000:10.2f} ms')
+
+
+def benchmark_streaming(line_count=500000):
+    """Report records/sec of the streaming Q3/Q5/Q6 pipelines per number of processes."""
+    random.seed(0)
+    words = ['level', 'test', 'madam', 'not', 'a', 'palindrome', 'wow', 'civic', 'noon', 'streaming']
+    with tempfile.TemporaryDirectory() as directory:
+        numbers_path = os.path.join(directory, 'numbers.txt')
+        words_path = os.path.join(directory, 'words.txt')
+        with open(numbers_path, 'w') as numbers_file, open(words_path, 'w') as words_file:
+            for _ in range(line_count):
+                numbers_file.write(' '.join(str(random.randint(0, 10 ** 6)) for _ in range(10)) + '\n')
+                words_file.write(' '.join(random.choice(words) for _ in range(10)) + '\n')
+
+        with open(numbers_path) as file:
+            numbers = [list(map(int, line.split())) for line in file]
+        with open(words_path) as file:
+            strings = [line.split() for line in file]
+        pipelines = [
+            ('Q3 in memory', lambda: Q3.cumulative_sum_squares(numbers), None),
+            ('Q6 in memory', lambda: Q6.count_palindromes(strings), None),
+            ('Q3 streaming', lambda processes: list(streaming.stream_cumulative_sum_squares(numbers_path, processes)), 1),
+            ('Q5 streaming', lambda processes: streaming.stream_sum_squares_of_evens(numbers_path, processes), 1),
+            ('Q6 streaming', lambda processes: list(streaming.stream_count_palindromes(words_path, processes)), 1),
+        ]
+        print(f'{line_count} lines of 10 items, {os.cpu_count()} CPU(s)')
+        for name, pipeline, streamed in pipelines:
+            for processes in sorted({1, 2, 4, os.cpu_count()}) if streamed else [1]:
+                elapsed = time_call(pipeline, processes) if streamed else time_call(pipeline)
+                print(f'  {name:<14} {processes} process(es) {line_count / elapsed:14,.0f} records/sec')
+
+
+BENCHMARKS = {
+    'primes': benchmark_primes,
+    'folds': benchmark_folds,
+    'streaming': benchmark_streaming,
+}
+
+if __name__ == '__main__':
+    # Run the benchmarks named on the command line, or all of them
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,40 @@
+from functools import reduce
+from itertools import accumulate, islice, repeat
+from operator import add, mul
+
+# Folds that walk the sequence once, without copying its tail like Q4's sequence[1:]
+fold_left = lambda operation: lambda sequence: reduce(operation, sequence)
+fold_right = lambda operation: lambda sequence: reduce(lambda acc, x: operation(x, acc), reversed(sequence))
+
+# Multiplies neighbours level by level, so big integers stay balanced (operation must be associative)
+fold_tree = lambda operation: lambda sequence: (lambda level: reduce(
+    lambda level, _: level if len(level) == 1 else
+    [operation(level[i], level[i + 1]) if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)],
+    repeat(None, max(len(level) - 1, 0).bit_length()),
+    level
+)[0])(list(sequence))
+
+# Drop-in replacement for Q4's cumulative_operation (a right fold)
+cumulative_operation = fold_right
+factorial = lambda n: fold_tree(mul)(range(1, n + 1)) if n > 1 else 1
+exponentiation = lambda base, exp: fold_left(mul)(repeat(base, exp)) if exp > 0 else 1
+
+# Fibonacci pairs (F(i), F(i + 1)) produced in a single pass
+fibonacci_pairs = lambda: accumulate(repeat(None), lambda pair, _: (pair[1], pair[0] + pair[1]), initial=(0, 1))
+# Same output as Q1's fibonacci: the first n Fibonacci numbers
+fibonacci = lambda n: [a for a, _ in islice(fibonacci_pairs(), n)]
+
+# Fast doubling over the bits of n: F(2k) = F(k)(2F(k+1) - F(k)), F(2k+1) = F(k)^2 + F(k+1)^2
+fibonacci_number = lambda n: reduce(
+    lambda pair, bit: (lambda c, d: (d, c + d) if bit == '1' else (c, d))(
+        pair[0] * (2 * pair[1] - pair[0]), pair[0] * pair[0] + pair[1] * pair[1]),
+    bin(n)[2:],
+    (0, 1)
+)[0]
+
+if __name__ == '__main__':
+    print(fibonacci(20))
+    print(fibonacci_number(100))
+    print(factorial(5))  # Output: 120
+    print(exponentiation(2, 3))  # Output: 8
+    print(cumulative_operation(add)([1, 2, 3, 4]))  # Output: 10
@@ -0,0 +1,124 @@
+from collections import Counter
+from bisect import bisect_left
+from math import isqrt
+
+try:
+    import numpy as np
+except ImportError:  # Fall back to bytearray storage
+    np = None
+
+# Largest value sieved in one piece; above it the sieve is built segment by segment
+SIEVE_LIMIT = 10 ** 8
+SEGMENT_SIZE = 1 << 22
+# Counting sort is used when the value range is at most this many times the number of primes
+COUNTING_SORT_FACTOR = 4
+
+
+def sieve(limit):
+    """Return a bytearray whose entry i is 1 when i is prime, for 0 <= i <= limit."""
+    return segment_sieve(0, limit + 1, range(2, isqrt(limit) + 1))
+
+
+def segment_sieve(low, high, base_primes):
+    """
+    Return a bytearray whose entry i is 1 when low + i is prime, for low <= low + i < high.
+
+    `base_primes` must contain every prime up to sqrt(high - 1); extra numbers
+    only cost time, so a plain range works for a sieve starting at 0.
+    """
+    is_prime = bytearray([1]) * (high - low)
+    for number in range(low, min(2, high)):
+        is_prime[number - low] = 0  # 0 and 1 are not prime
+    for p in base_primes:
+        if p * p >= high:
+            break
+        if low == 0 and not is_prime[p]:
+            continue  # Multiples of a composite are already crossed out
+        start = max(p * p, (low + p - 1) // p * p)
+        is_prime[start - low::p] = bytes(len(range(start, high, p)))
+    return is_prime
+
+
+def segment_sieve_numpy(low, high, base_primes):
+    """NumPy version of segment_sieve, returning a boolean array."""
+    is_prime = np.ones(high - low, dtype=bool)
+    is_prime[:max(0, min(2, high) - low)] = False
+    for p in base_primes:
+        p = int(p)
+        if p * p >= high:
+            break
+        if low == 0 and not is_prime[p]:
+            continue
+        start = max(p * p, (low + p - 1) // p * p)
+        is_prime[start - low::p] = False
+    return is_prime
+
+
+def primes_among(candidates, make_sieve, base_primes):
+    """
+    Yield (start, end, low, is_prime) for the segments holding the sorted `candidates`.
+
+    candidates[start:end] lie in the segment, and is_prime[i] tells whether
+    low + i is prime. Ranges without candidates are skipped, so sparse inputs
+    with a huge maximum only sieve the segments they actually use.
+    """
+    start = 0
+    while start < len(candidates):
+        low = int(candidates[start])
+        high = low + SEGMENT_SIZE
+        end = bisect_left(candidates, high, start)
+        yield start, end, low, make_sieve(low, min(high, int(candidates[end - 1]) + 1), base_primes)
+        start = end
+
+
+def prime_desc_bytearray(nums):
+    """Sieve-backed prime_desc using a bytearray and a Counter of the candidates."""
+    counts = Counter(x for x in nums if x > 1)
+    if not counts:
+        return []
+    max_value = max(counts)
+    if max_value <= SIEVE_LIMIT:
+        is_prime = sieve(max_value)
+        primes = [x for x in counts if is_prime[x]]
+    else:
+        candidates = sorted(counts)
+        base_primes = [p for p, flag in enumerate(sieve(isqrt(max_value))) if flag]
+        primes = [candidates[i]
+                  for start, end, low, is_prime in primes_among(candidates, segment_sieve, base_primes)
+                  for i in range(start, end) if is_prime[candidates[i] - low]]
+    primes.sort(reverse=True)  # Only the distinct primes are sorted
+    return [p for p in primes for _ in range(counts[p])]
+
+
+def prime_desc_numpy(nums):
+    """Sieve-backed prime_desc using NumPy arrays, with a counting sort for dense values."""
+    if isinstance(nums, (list, tuple, range, np.ndarray)):
+        values = np.asarray(nums, dtype=np.int64)
+    else:
+        values = np.fromiter(nums, dtype=np.int64)  # Generators, sets and other iterables, like Q8
+    values = values[values > 1]
+    if not values.size:
+        return []
+    max_value = int(values.max())
+    if max_value <= SIEVE_LIMIT:
+        is_prime = segment_sieve_numpy(0, max_value + 1, range(2, isqrt(max_value) + 1))
+        primes = values[is_prime[values]]
+        if max_value > COUNTING_SORT_FACTOR * primes.size:
+            return np.sort(primes)[::-1].tolist()
+        counts = np.bincount(primes)  # Counting sort: occurrences of each value
+        distinct = np.flatnonzero(counts)[::-1]
+        return np.repeat(distinct, counts[distinct]).tolist()
+    candidates, counts = np.unique(values, return_counts=True)
+    keep = np.zeros(len(candidates), dtype=bool)
+    base_primes = np.flatnonzero(segment_sieve_numpy(0, isqrt(max_value) + 1, range(2, isqrt(isqrt(max_value)) + 1)))
+    for start, end, low, is_prime in primes_among(candidates, segment_sieve_numpy, base_primes):
+        keep[start:end] = is_prime[candidates[start:end] - low]
+    return np.repeat(candidates[keep][::-1], counts[keep][::-1]).tolist()
+
+
+# Same entry point as Q8's prime_desc, for inputs of millions of numbers
+prime_desc = lambda nums: prime_desc_numpy(nums) if np is not None else prime_desc_bytearray(nums)
+
+if __name__ == '__main__':
+    nums = [10, 7, 4, 3, 11, 13, 17, 18]
+    print(prime_desc(nums))
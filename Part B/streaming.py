@@ -0,0 +1,146 @@
+import os
+from itertools import islice
+from multiprocessing import Pool
+from operator import eq
+
+try:
+    import numpy as np
+except ImportError:  # Fall back to pure Python chunk processing
+    np = None
+
+# Bytes of input handed to a worker at a time
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+WHITESPACE = b' \t\n\r\x0b\x0c'
+INT64_LIMIT = 2 ** 63
+
+
+def chunk_bounds(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Split a file into (start, end) byte ranges of about `chunk_size` that end at line breaks."""
+    size = os.path.getsize(path)
+    bounds = []
+    start = 0
+    with open(path, 'rb') as file:
+        while start < size:
+            file.seek(min(start + chunk_size, size))
+            file.readline()  # Move to the end of the line
+            end = min(file.tell(), size)
+            bounds.append((path, start, end))
+            start = end
+    return bounds
+
+
+def read_chunk(bounds):
+    """Read the bytes of a chunk returned by chunk_bounds."""
+    path, start, end = bounds
+    with open(path, 'rb') as file:
+        file.seek(start)
+        return file.read(end - start)
+
+
+def split_lines(chunk):
+    """Return the lines of a chunk as strings, without line breaks."""
+    lines = chunk.decode().split('\n')
+    if lines[-1] == '':
+        lines.pop()  # The chunk ends with a line break
+    return lines
+
+
+def is_palindrome(s):
+    """Compare the first half of s with its reversed second half, without copying it."""
+    return all(map(eq, islice(s, len(s) // 2), reversed(s)))
+
+
+def tokenize(chunk):
+    """
+    Find the whitespace-separated tokens of a chunk with NumPy.
+
+    Returns the chunk as a uint8 array, the start and end offsets of each
+    token, the index of the line each token is on, and the number of lines.
+    """
+    data = np.frombuffer(chunk, dtype=np.uint8)
+    is_token = np.concatenate(([False], ~np.isin(data, np.frombuffer(WHITESPACE, dtype=np.uint8)), [False]))
+    changes = np.flatnonzero(is_token[1:] != is_token[:-1])
+    starts, ends = changes[0::2], changes[1::2]
+    line_breaks = np.flatnonzero(data == ord('\n'))
+    line_count = len(line_breaks) + (1 if chunk and not chunk.endswith(b'\n') else 0)
+    return data, starts, ends, np.searchsorted(line_breaks, starts), line_count
+
+
+def even_squares(chunk, token_count):
+    """
+    Return an int64 array with x * x for each even number x of a chunk and 0 for the odd ones.
+
+    Returns None when a token is not an integer or the sums could overflow, so
+    the caller can fall back to exact Python integers.
+    """
+    try:
+        values = np.fromstring(chunk.decode(), dtype=np.int64, sep=' ')
+    except ValueError:  # A token is not an integer
+        return None
+    if values.size != token_count:
+        return None  # NumPy reads a chunk with only whitespace as [0]
+    if values.size and int(np.abs(values).max()) ** 2 * values.size >= INT64_LIMIT:
+        return None
+    return np.where(values % 2 == 0, values * values, 0)
+
+
+def sum_squares_chunk(bounds):
+    """Q3 on a chunk: the sum of the squares of the even numbers of each line."""
+    chunk = read_chunk(bounds)
+    if np is not None:
+        _, starts, _, line_of_token, line_count = tokenize(chunk)
+        squares = even_squares(chunk, len(starts))
+    if np is None or squares is None:
+        return [sum(x * x for x in map(int, line.split()) if x % 2 == 0) for line in split_lines(chunk)]
+    line_starts = np.searchsorted(line_of_token, np.arange(line_count + 1))
+    totals = np.concatenate(([0], np.cumsum(squares)))
+    return (totals[line_starts[1:]] - totals[line_starts[:-1]]).tolist()
+
+
+def total_squares_chunk(bounds):
+    """Q5 on a chunk: the sum of the squares of all its even numbers."""
+    chunk = read_chunk(bounds)
+    if np is not None:
+        squares = even_squares(chunk, len(tokenize(chunk)[1]))
+    if np is None or squares is None:
+        return sum(x * x for x in map(int, chunk.split()) if x % 2 == 0)
+    return int(squares.sum())
+
+
+def count_palindromes_chunk(bounds):
+    """Q6 on a chunk: the number of palindromes on each line."""
+    chunk = read_chunk(bounds)
+    if np is None or not chunk.isascii():
+        return [sum(map(is_palindrome, line.split())) for line in split_lines(chunk)]
+
+    data, starts, ends, line_of_token, line_count = tokenize(chunk)
+    half_lengths = (ends - starts) // 2
+    palindrome = np.ones(len(starts), dtype=bool)
+    remaining = np.flatnonzero(half_lengths > 0)  # Tokens still being compared
+    offset = 0
+    while remaining.size:
+        # Compare the offset-th character from each end, for every remaining token at once
+        palindrome[remaining] = data[starts[remaining] + offset] == data[ends[remaining] - 1 - offset]
+        offset += 1
+        remaining = remaining[palindrome[remaining] & (half_lengths[remaining] > offset)]
+    return np.bincount(line_of_token[palindrome], minlength=line_count).tolist()
+
+
+def map_chunks(path, worker, processes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the worker's result for each chunk of a file, in file order, using a process pool."""
+    bounds = chunk_bounds(path, chunk_size)
+    if processes == 1 or len(bounds) <= 1:
+        yield from map(worker, bounds)
+        return
+    with Pool(processes) as pool:
+        yield from pool.imap(worker, bounds)
+
+
+# Streaming versions of Q3, Q5 and Q6 over newline-delimited files: one sublist per line,
+# items separated by whitespace. Q3 and Q6 yield one result per line, in order.
+stream_cumulative_sum_squares = lambda path, processes=None, chunk_size=DEFAULT_CHUNK_SIZE: (
+    result for part in map_chunks(path, sum_squares_chunk, processes, chunk_size) for result in part)
+stream_sum_squares_of_evens = lambda path, processes=None, chunk_size=DEFAULT_CHUNK_SIZE: sum(
+    map_chunks(path, total_squares_chunk, processes, chunk_size))
+stream_count_palindromes = lambda path, processes=None, chunk_size=DEFAULT_CHUNK_SIZE: (
+    result for part in map_chunks(path, count_palindromes_chunk, processes, chunk_size) for result in part)
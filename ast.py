@@ -1,6 +1,7 @@
 class AST:
     """Base class for all Abstract Syntax Tree (AST) nodes."""
-    pass
+    inferred_type = None  # Static type set by the TypeChecker, if known
+    common = False  # Repeated pure operation, computed once per call (see sharing.py)
 
 
 class BinaryOperation(AST):
@@ -10,6 +11,7 @@ class BinaryOperation(AST):
         self.left = left  # Left operand
         self.operator = operator  # Operator (e.g., +, -, *)
         self.right = right  # Right operand
+        self.fast_op = None  # Specialized integer operation set by the TypeChecker
 
     def __str__(self):
         return f'({self.left} {self.operator.value} {self.right})'
@@ -62,11 +64,14 @@ class Variable(AST):
 
 class FunctionDefinition(AST):
     """Represents a function definition."""
+    caches_common = False  # Each call caches the body's common expressions (see sharing.py)
 
     def __init__(self, name, parameters, body):
         self.name = name  # Function name
         self.parameters = parameters  # Function parameters
         self.body = body  # List of expressions in the function body
+        self.call_count = 0  # Calls made in the interpreted tier
+        self.strict_parameters = None  # Parameters always evaluated, set by the StrictnessAnalyzer
 
     def __str__(self):
         params_str = ", ".join(param.value for param in self.parameters)
@@ -79,11 +84,13 @@ class FunctionDefinition(AST):
 
 class LambdaExpression(AST):
     """Represents a lambda expression."""
+    caches_common = False  # Each call caches the body's common expressions (see sharing.py)
 
     def __init__(self, parameters, body):
         self.parameters = parameters  # Lambda parameters
         self.body = body  # Lambda body (a single expression)
         self.env = None  # Store the environment where the lambda is defined
+        self.arity_checked = False  # Set by the TypeChecker when calls need no arity check
 
     def __str__(self):
         params_str = ", ".join(param.value for param in self.parameters)
@@ -99,6 +106,8 @@ class FunctionApplication(AST):
     def __init__(self, func, arguments):
         self.func = func  # Function or lambda to be applied
         self.arguments = arguments  # Arguments for the function or lambda
+        self.arity_checked = False  # Set by the TypeChecker when the arity is known to match
+        self.simple_arguments = None  # Set by the StrictnessAnalyzer for lazy evaluation
 
     def __str__(self):
         args_str = ", ".join(str(arg) for arg in self.arguments)
@@ -125,6 +134,19 @@ class IfStatement(AST):
         return self.__str__()
 
 
+class ImportStatement(AST):
+    """Represents an import of a module."""
+
+    def __init__(self, module):
+        self.module = module  # Token with the module name
+
+    def __str__(self):
+        return f'import {self.module.value}'
+
+    def __repr__(self):
+        return self.__str__()
+
+
 class PrintStatement(AST):
     """Represents a print statement."""
 
@@ -0,0 +1,169 @@
+import os
+import sys
+import tempfile
+import time
+from lexer import Lexer
+from parser import Parser
+from typechecker import TypeChecker
+from interpreter import Interpreter, DEFAULT_TIER_THRESHOLD
+from modules import ModuleLoader
+from output import LineBufferedOutput, BufferedOutput, CaptureOutput
+from sharing import share_subexpressions, tree_size
+
+FIBONACCI = '''
+defun fib(n) {
+    if (n < 2) {
+        n
+    } else {
+        fib(n - 1) + fib(n - 2)
+    }
+}
+'''
+
+
+def parse_program(text, share=False):
+    """Lex, parse and type check a program, sharing its common subexpressions if asked."""
+    tree = Parser(Lexer(text)).parse()
+    TypeChecker().check(tree)
+    if share:
+        share_subexpressions(tree)
+    return tree
+
+
+def time_run(make_interpreter, text, repeat=3, share=False):
+    """Return the best wall-clock time of parsing and running a program, and its interpreter."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        interpreter = make_interpreter()
+        interpreter.interpret(parse_program(text, share))
+        interpreter.output.flush()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, interpreter
+
+
+def benchmark_tiering():
+    """Compare interpreting only, compiling everything and tiered execution."""
+    programs = [
+        ('short (fib 5)', FIBONACCI + 'fib(5)'),
+        ('long (fib 20)', FIBONACCI + 'fib(20)'),
+    ]
+    modes = [
+        ('interpreter', None),
+        ('compile all', 0),
+        (f'tiered ({DEFAULT_TIER_THRESHOLD})', DEFAULT_TIER_THRESHOLD),
+    ]
+    for program_name, text in programs:
+        print(program_name)
+        for mode_name, threshold in modes:
+            elapsed, interpreter = time_run(lambda: Interpreter(tier_threshold=threshold), text)
+            print(f'  {mode_name:<16} {elapsed * 1000:9.2f} ms  {interpreter.counters}')
+
+
+def benchmark_lazy():
+    """Compare eager and call-by-need evaluation."""
+    programs = [
+        ('unused argument', FIBONACCI + '''
+defun choose(c, a, b) { if (c) { a } else { b } }
+choose(True, 1, fib(20))'''),
+        ('short-circuit', FIBONACCI + 'False && (fib(20) == 0)'),
+        ('strict (fib 20)', FIBONACCI + 'fib(20)'),
+    ]
+    for program_name, text in programs:
+        print(program_name)
+        for mode_name, lazy in (('eager', False), ('lazy', True)):
+            elapsed, _ = time_run(lambda: Interpreter(lazy=lazy), text)
+            print(f'  {mode_name:<16} {elapsed * 1000:9.2f} ms')
+
+
+def benchmark_modules():
+    """Compare pasting helpers into a program with importing them from a cached module."""
+    helpers = ''.join(f'defun helper{i}(x) {{ if (x > {i}) {{ x - {i} }} else {{ x + {i} }} }}\n'
+                      for i in range(2000))
+    for module_count in (1, 10):
+        with tempfile.TemporaryDirectory() as directory:
+            pasted = ''
+            for index in range(module_count):
+                module_text = helpers.replace('defun helper', f'defun m{index}_helper')
+                pasted += module_text
+                with open(os.path.join(directory, f'helpers{index}.lambda'), 'w') as file:
+                    file.write(module_text)
+            imported = ''.join(f'import helpers{index}\n' for index in range(module_count)) + 'm0_helper7(3)'
+            pasted += 'm0_helper7(3)'
+
+            print(f'{module_count} module(s) of 2000 defuns, one used')
+            for mode_name, text in (('pasted', pasted), ('import (cold)', imported), ('import (warm)', imported)):
+                ModuleLoader.modules.clear()  # Start like a new process
+                elapsed, _ = time_run(lambda: Interpreter(module_loader=ModuleLoader([directory])), text, repeat=1)
+                print(f'  {mode_name:<16} {elapsed * 1000:9.2f} ms')
+
+
+def benchmark_output(line_count=100000):
+    """Compare the outputs on a program that only prints, writing to a temporary file."""
+    tree = parse_program(''.join(f'print({i})\n' for i in range(line_count)))  # Parsed once, not timed
+    outputs = [
+        ('line-buffered', LineBufferedOutput),
+        ('block-buffered', BufferedOutput),
+        ('capture', lambda file: CaptureOutput()),
+    ]
+    print(f'{line_count} printed lines to a temporary file')
+    with tempfile.TemporaryFile('w') as file:
+        for output_name, make_output in outputs:
+            best = None
+            for _ in range(3):
+                file.seek(0)
+                file.truncate()
+                interpreter = Interpreter(output=make_output(file))
+                start = time.perf_counter()
+                interpreter.interpret(tree)
+                interpreter.output.flush()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            print(f'  {output_name:<16} {best * 1000:9.2f} ms  {line_count / best:12,.0f} lines/sec')
+
+
+def benchmark_sharing():
+    """Report AST size with and without hash-consing, and the time saved by computing common operations once."""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Demo And Tests', 'demo.lambda')) as file:
+        demo = file.read()
+    distance = '''
+defun distance(x, y, n) {
+    if (n == 0) {
+        0
+    } else {
+        if ((x * x + y * y) % 7 == (x * x + y * y) % 5) {
+            (x * x + y * y) / 3 + distance(x + 1, y, n - 1)
+        } else {
+            (x * x + y * y) / 2 + distance(x, y + 1, n - 1)
+        }
+    }
+}
+'''
+    repeated = distance + ''.join(f'distance({i}, {i + 1}, 50)\n' for i in range(500))
+    for program_name, text in (('demo.lambda', demo), ('repeated (x * x + y * y)', repeated)):
+        tree = parse_program(text)
+        before = tree_size(tree)
+        after = tree_size(share_subexpressions(tree))
+        print(program_name)
+        print(f'  {"nodes":<16} {before["nodes"]:9} -> {after["nodes"]}')
+        print(f'  {"bytes":<16} {before["bytes"]:9} -> {after["bytes"]}')
+    print('repeated (x * x + y * y), run time')
+    for mode_name, threshold in (('interpreter', None), ('compile all', 0)):
+        for share in (False, True):
+            elapsed, _ = time_run(lambda: Interpreter(tier_threshold=threshold), repeated, share=share)
+            print(f'  {mode_name + (" (shared)" if share else ""):<22} {elapsed * 1000:9.2f} ms')
+
+
+BENCHMARKS = {
+    'tiering': benchmark_tiering,
+    'lazy': benchmark_lazy,
+    'modules': benchmark_modules,
+    'output': benchmark_output,
+    'sharing': benchmark_sharing,
+}
+
+if __name__ == '__main__':
+    # Run the benchmarks named on the command line, or all of them
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,279 @@
+from ast import *
+from lexer import *
+from lazy import Thunk, is_ready
+
+
+class Compiler:
+    """
+    Compiles AST nodes into specialized Python closures.
+
+    Each node becomes a closure that takes the current environment and returns
+    the node's value, so executing compiled code skips the per-node visitor
+    dispatch of the Interpreter. The compiled code shares the interpreter's
+    state: it keeps `global_env` up to date around calls and goes through
+    `Interpreter.call_function` for defuns, so the behaviour of a program does
+    not depend on which tier runs it. Code compiled for a lazy interpreter
+    forces thunks on variable lookups and creates them for arguments, and
+    common operations reuse the values in `Interpreter.cse_values`.
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+
+    def compile(self, node):
+        """Compile a node into a closure by calling the matching compile method."""
+        method_name = 'compile_' + type(node).__name__
+        compiler = getattr(self, method_name, self.generic_compile)
+        code = compiler(node)
+        if node.common:
+            return self.compile_common(node, code)
+        return code
+
+    def compile_common(self, node, code):
+        """Wrap the code of a common operation so it is computed once per call."""
+        interpreter = self.interpreter
+
+        def reuse(env):
+            values = interpreter.cse_values
+            if values is None:
+                return code(env)
+            if node in values:
+                return values[node]
+            value = values[node] = code(env)
+            return value
+        return reuse
+
+    def generic_compile(self, node):
+        """Fallback method if no explicit compile function is found."""
+        self.interpreter.error(f'No compile_{type(node).__name__} method')
+
+    def compile_block(self, block):
+        """Compile a list of expressions into a closure returning the last value."""
+        codes = [self.compile(expr) for expr in block]
+        if len(codes) == 1:
+            return codes[0]
+
+        def run_block(env):
+            result = None
+            for code in codes:
+                result = code(env)
+            return result
+        return run_block
+
+    def compile_function(self, node):
+        """Compile the body of a function definition."""
+        return self.compile_block(node.body)
+
+    def compile_BinaryOperation(self, node):
+        """Compile a binary operation, using the integer fast path when available."""
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+        error = self.interpreter.error
+        operator = node.operator.type
+
+        if node.fast_op is not None:
+            fast_op = node.fast_op
+            return lambda env: fast_op(left(env), right(env))
+
+        if operator == PLUS:
+            return lambda env: left(env) + right(env)
+        elif operator == MINUS:
+            return lambda env: left(env) - right(env)
+        elif operator == MUL:
+            return lambda env: left(env) * right(env)
+        elif operator == DIV:
+            def divide(env):
+                left_value = left(env)
+                right_value = right(env)
+                if right_value == 0:
+                    error("Division by zero")
+                return left_value // right_value
+            return divide
+        elif operator == MOD:
+            def modulo(env):
+                left_value = left(env)
+                right_value = right(env)
+                if right_value == 0:
+                    error("Modulo by zero")
+                return left_value % right_value
+            return modulo
+        elif operator == AND and self.interpreter.lazy:
+            return lambda env: left(env) and right(env)
+        elif operator == OR and self.interpreter.lazy:
+            return lambda env: left(env) or right(env)
+        elif operator == AND:
+            # Both sides are evaluated, as in the interpreter
+            def logical_and(env):
+                left_value = left(env)
+                right_value = right(env)
+                return left_value and right_value
+            return logical_and
+        elif operator == OR:
+            def logical_or(env):
+                left_value = left(env)
+                right_value = right(env)
+                return left_value or right_value
+            return logical_or
+        elif operator == EQ:
+            return lambda env: left(env) == right(env)
+        elif operator == NEQ:
+            return lambda env: left(env) != right(env)
+        elif operator == GT:
+            return lambda env: left(env) > right(env)
+        elif operator == LT:
+            return lambda env: left(env) < right(env)
+        elif operator == GTE:
+            return lambda env: left(env) >= right(env)
+        elif operator == LTE:
+            return lambda env: left(env) <= right(env)
+        self.interpreter.error(f'Unknown operator {node.operator.value}')
+
+    def compile_UnaryOperation(self, node):
+        """Compile a unary operation (e.g., NOT)."""
+        operand = self.compile(node.operand)
+        if node.operator.type == NOT:
+            return lambda env: not operand(env)
+        self.interpreter.error(f'Unknown operator {node.operator.value}')
+
+    def compile_Literal(self, node):
+        """Compile a literal into a closure returning its value."""
+        value = node.value
+        return lambda env: value
+
+    def compile_Variable(self, node):
+        """Compile a variable lookup in the current environment."""
+        name = node.name
+        lookup_import = self.interpreter.lookup_import
+
+        if self.interpreter.lazy:
+            def lookup_lazy(env):
+                try:
+                    value = env[name]
+                except KeyError:
+                    return lookup_import(name)
+                if isinstance(value, Thunk):
+                    return value.force()
+                return value
+            return lookup_lazy
+
+        def lookup(env):
+            try:
+                return env[name]
+            except KeyError:
+                return lookup_import(name)
+        return lookup
+
+    def compile_FunctionDefinition(self, node):
+        """Compile a function definition into a closure that binds it."""
+        name = node.name.value
+
+        def define(env):
+            env[name] = node
+        return define
+
+    def compile_FunctionApplication(self, node):
+        """Compile a function or lambda application."""
+        func_code = self.compile(node.func)
+        interpreter = self.interpreter
+
+        if interpreter.lazy:
+            delayed_args = [self.compile_lazy_argument(node, index) for index in range(len(node.arguments))]
+
+            def evaluate_arguments(func, env):
+                strict = func.strict_parameters if isinstance(func, FunctionDefinition) else None
+                return [delay(env, strict) for delay in delayed_args]
+        else:
+            arg_codes = [self.compile(arg) for arg in node.arguments]
+
+            def evaluate_arguments(func, env):
+                return [arg_code(env) for arg_code in arg_codes]
+
+        def apply(env):
+            func = func_code(env)
+            args = evaluate_arguments(func, env)
+            if callable(func):
+                return func(*args)
+            elif isinstance(func, FunctionDefinition):
+                # Read at call time: the REPL's TypeChecker clears the mark when the name is redefined
+                return interpreter.call_function(func, args, node.arity_checked)
+            else:
+                interpreter.error(f'{node.func} is not a function')
+        return apply
+
+    def compile_lazy_argument(self, node, index):
+        """Compile an argument into a closure that delays it as Interpreter.delay_arguments does."""
+        arg = node.arguments[index]
+        interpreter = self.interpreter
+        if isinstance(arg, Literal):
+            value = arg.value
+            return lambda env, strict: value
+
+        code = self.compile(arg)
+        simple = node.simple_arguments[index] if node.simple_arguments else None
+        if isinstance(arg, Variable):
+            name = arg.name
+
+            def share(env, strict):
+                if name in env:
+                    return env[name]  # Share the value or thunk of the variable
+                return Thunk(code, env, env, interpreter)
+            return share
+
+        def delay(env, strict):
+            if strict and index < len(strict) and strict[index] and is_ready(simple, env):
+                return code(env)
+            return Thunk(code, env, env, interpreter)
+        return delay
+
+    def compile_LambdaExpression(self, node):
+        """Compile a lambda expression into a closure creating the lambda function."""
+        body = self.compile(node.body)
+        parameters = [param.value for param in node.parameters]
+        interpreter = self.interpreter
+
+        def create_lambda(env):
+            def lambda_function(*args):
+                if not node.arity_checked and len(args) != len(parameters):
+                    interpreter.error(f'Lambda function expected {len(parameters)} arguments, got {len(args)}')
+                new_env = interpreter.global_env.copy()
+                new_env.update(zip(parameters, args))
+                previous_env = interpreter.global_env
+                previous_values = interpreter.cse_values
+                interpreter.global_env = {**node.env, **new_env}
+                interpreter.cse_values = {} if node.caches_common else None
+                result = body(interpreter.global_env)
+                interpreter.global_env = previous_env
+                interpreter.cse_values = previous_values
+                return result
+
+            node.env = env.copy()
+            return lambda_function
+        return create_lambda
+
+    def compile_ImportStatement(self, node):
+        """Compile an import statement."""
+        interpreter = self.interpreter
+        return lambda env: interpreter.visit_ImportStatement(node)
+
+    def compile_IfStatement(self, node):
+        """Compile an if-else statement."""
+        condition = self.compile(node.condition)
+        true_block = self.compile_block(node.true_block)
+        false_block = self.compile_block(node.false_block) if node.false_block else None
+
+        def run_if(env):
+            if condition(env):
+                return true_block(env)
+            elif false_block is not None:
+                return false_block(env)
+            return None
+        return run_if
+
+    def compile_PrintStatement(self, node):
+        """Compile a print statement."""
+        expression = self.compile(node.expression)
+        interpreter = self.interpreter
+
+        def run_print(env):
+            interpreter.output.write(expression(env))  # The output may be replaced between runs
+        return run_print
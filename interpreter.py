@@ -1,11 +1,54 @@
 from ast import *
 from lexer import *
+from compiler import Compiler
+from lazy import Thunk, StrictnessAnalyzer, is_ready
+from modules import ModuleLoader
+from output import LineBufferedOutput
+
+# Number of calls after which a function is compiled to Python closures
+DEFAULT_TIER_THRESHOLD = 50
 
 class Interpreter:
-    """Interpreter for executing the Abstract Syntax Tree (AST)."""
+    """
+    Interpreter for executing the Abstract Syntax Tree (AST).
+
+    Functions start in the tree-walking tier. Once a function has been called
+    `tier_threshold` times it is compiled by the Compiler and every later call
+    runs the compiled version. A threshold of None disables compilation.
+
+    With `lazy=True` arguments are passed by need: each one becomes a Thunk that
+    is evaluated the first time its parameter is used, and `&&`/`||` skip their
+    right operand when the left one decides the result. Arguments that a
+    function is sure to use are still evaluated eagerly when that cannot be
+    observed (see StrictnessAnalyzer).
+
+    Imported modules are only run when a name that is not defined otherwise
+    is found among their exports; their top level runs once, in an
+    environment of its own.
 
-    def __init__(self):
+    Printed values go to `output` (see output.py), which writes each line to
+    stdout right away unless another output is given.
+
+    Operations marked `common` by sharing.py are computed once per call of a
+    body marked `caches_common`; `cse_values` holds their values for the
+    current call, or is None when nothing is cached.
+    """
+
+    def __init__(self, tier_threshold=DEFAULT_TIER_THRESHOLD, lazy=False, module_loader=None, output=None):
         self.global_env = {}
+        self.output = output or LineBufferedOutput()
+        self.module_loader = module_loader or ModuleLoader()
+        self.imports = []  # Imported Modules, in import order
+        self.module_envs = {}  # Module -> environment its top level ran in
+        self.imported_names = {}  # Names already resolved from modules
+        self.tier_threshold = tier_threshold
+        self.lazy = lazy
+        self.strictness = StrictnessAnalyzer() if lazy else None
+        self.compiler = Compiler(self)
+        self.compiled_functions = {}  # FunctionDefinition -> compiled body
+        self.cse_values = None  # Common operation -> value, for the current call
+        # Debug counters for observing tier-ups
+        self.counters = {'interpreted_calls': 0, 'compiled_calls': 0, 'compilations': 0}
 
     def error(self, message):
         """Raise a runtime error with a custom message."""
@@ -15,14 +58,34 @@ class Interpreter:
         """Visit a node in the AST and execute the corresponding method."""
         method_name = 'visit_' + type(node).__name__
         visitor = getattr(self, method_name, self.generic_visit)
+        if node.common and self.cse_values is not None:
+            return self.visit_common(node, visitor)
         return visitor(node)
 
+    def visit_common(self, node, visitor):
+        """Return the value of a common operation, computing it once per call."""
+        values = self.cse_values
+        if node in values:
+            return values[node]
+        value = values[node] = visitor(node)
+        return value
+
     def generic_visit(self, node):
         """Fallback method if no explicit visitor function is found."""
         self.error(f'No visit_{type(node).__name__} method')
 
     def visit_BinaryOperation(self, node):
         """Evaluate a binary operation (e.g., +, -, *, /)."""
+        if node.fast_op is not None:
+            # Both operands are statically known integers
+            return node.fast_op(self.visit(node.left), self.visit(node.right))
+
+        if self.lazy and node.operator.type in (AND, OR):
+            left_value = self.visit(node.left)
+            if node.operator.type == AND:
+                return left_value and self.visit(node.right)
+            return left_value or self.visit(node.right)
+
         left_value = self.visit(node.left)
         right_value = self.visit(node.right)
         operator = node.operator.type
@@ -72,9 +135,44 @@ class Interpreter:
         """Return the value of a variable."""
         variable_name = node.name
         if variable_name in self.global_env:
-            return self.global_env[variable_name]
+            value = self.global_env[variable_name]
+            if self.lazy and isinstance(value, Thunk):
+                return value.force()
+            return value
         else:
-            self.error(f'Variable {variable_name} not defined')
+            return self.lookup_import(variable_name)
+
+    def lookup_import(self, name):
+        """Return the value of a name exported by an imported module, loading it if needed."""
+        if name in self.imported_names:
+            return self.imported_names[name]
+        for module in self.imports:  # Modules imported by a loaded module are appended as we go
+            if name in self.module_loader.names(module):
+                if module not in self.module_envs:
+                    self.run_module(module)
+                value = self.module_envs[module][name]
+                self.imported_names[name] = value
+                return value
+        self.error(f'Variable {name} not defined')
+
+    def run_module(self, module):
+        """Run the top level of a module in an environment of its own."""
+        tree = self.module_loader.load(module)
+        if self.lazy:
+            self.strictness.analyze(tree)
+        env = {}
+        self.module_envs[module] = env
+        previous_env = self.global_env
+        self.global_env = env
+        for node in tree:
+            self.visit(node)
+        self.global_env = previous_env
+
+    def visit_ImportStatement(self, node):
+        """Make a module's names available; the module is only loaded when one is used."""
+        module = self.module_loader.find(node.module.value)
+        if module not in self.imports:
+            self.imports.append(module)
 
     def visit_FunctionDefinition(self, node):
         """Store a function definition in the global environment."""
@@ -83,38 +181,81 @@ class Interpreter:
     def visit_FunctionApplication(self, node):
         """Apply a function or lambda with arguments."""
         func = self.visit(node.func)
-        args = [self.visit(arg) for arg in node.arguments]
+        if self.lazy:
+            args = self.delay_arguments(func, node)
+        else:
+            args = [self.visit(arg) for arg in node.arguments]
 
         if callable(func):
             return func(*args)
         elif isinstance(func, FunctionDefinition):
-            if len(args) != len(func.parameters):
-                self.error(f'Function {func.name.value} expected {len(func.parameters)} arguments, got {len(args)}')
-            new_env = self.global_env.copy()
-            for param, arg in zip(func.parameters, args):
-                new_env[param.value] = arg
-            previous_env = self.global_env
-            self.global_env = new_env
+            return self.call_function(func, args, node.arity_checked)
+        else:
+            self.error(f'{node.func} is not a function')
+
+    def delay_arguments(self, func, node):
+        """Turn the arguments of an application into thunks, unless they can be passed as they are."""
+        strict = func.strict_parameters if isinstance(func, FunctionDefinition) else None
+        simple = node.simple_arguments
+        env = self.global_env
+        args = []
+        for index, arg in enumerate(node.arguments):
+            if isinstance(arg, Literal):
+                args.append(arg.value)
+            elif isinstance(arg, Variable) and arg.name in env:
+                args.append(env[arg.name])  # Share the value or thunk of the variable
+            elif strict and simple and index < len(strict) and strict[index] and is_ready(simple[index], env):
+                args.append(self.visit(arg))
+            else:
+                args.append(Thunk(self.visit, arg, env, self))
+        return args
+
+    def call_function(self, func, args, arity_checked=False):
+        """Call a defun, compiling it first if it has become hot."""
+        if not arity_checked and len(args) != len(func.parameters):
+            self.error(f'Function {func.name.value} expected {len(func.parameters)} arguments, got {len(args)}')
+        new_env = self.global_env.copy()
+        for param, arg in zip(func.parameters, args):
+            new_env[param.value] = arg
+        previous_env = self.global_env
+        previous_values = self.cse_values
+        self.global_env = new_env
+        self.cse_values = {} if func.caches_common else None
+
+        compiled = self.compiled_functions.get(func)
+        if compiled is None and self.tier_threshold is not None:
+            func.call_count += 1
+            if func.call_count > self.tier_threshold:
+                compiled = self.compiled_functions[func] = self.compiler.compile_function(func)
+                self.counters['compilations'] += 1
+
+        if compiled is not None:
+            self.counters['compiled_calls'] += 1
+            result = compiled(new_env)
+        else:
+            self.counters['interpreted_calls'] += 1
             result = None
             for expr in func.body:  # Iterate over the list of expressions
                 result = self.visit(expr)
-            self.global_env = previous_env
-            return result
-        else:
-            self.error(f'{node.func} is not a function')
+        self.global_env = previous_env
+        self.cse_values = previous_values
+        return result
 
     def visit_LambdaExpression(self, node):
         """Return a callable lambda function."""
         def lambda_function(*args):
-            if len(args) != len(node.parameters):
+            if not node.arity_checked and len(args) != len(node.parameters):
                 self.error(f'Lambda function expected {len(node.parameters)} arguments, got {len(args)}')
             new_env = self.global_env.copy()
             for param, arg in zip(node.parameters, args):
                 new_env[param.value] = arg
             previous_env = self.global_env
+            previous_values = self.cse_values
             self.global_env = {**node.env, **new_env}
+            self.cse_values = {} if node.caches_common else None
             result = self.visit(node.body)
             self.global_env = previous_env
+            self.cse_values = previous_values
             return result
 
         node.env = self.global_env.copy()
@@ -135,10 +276,12 @@ class Interpreter:
     def visit_PrintStatement(self, node):
         """Evaluate a print statement."""
         value = self.visit(node.expression)
-        print(value)
+        self.output.write(value)
 
     def interpret(self, tree):
         """Interpret the AST starting from the root."""
+        if self.lazy:
+            self.strictness.analyze(tree)
         result = None
         for node in tree:
             result = self.visit(node)
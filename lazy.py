@@ -0,0 +1,193 @@
+from ast import *
+from lexer import *
+from typechecker import Bindings
+
+
+class Thunk:
+    """
+    A delayed argument for call-by-need evaluation.
+
+    `evaluate(argument)` is run in the environment the thunk was created in the
+    first time the thunk is forced; the value is memoized and the captured
+    environment released. Common operations are not cached while forcing,
+    since the values cached for the current call belong to another environment.
+    """
+
+    __slots__ = ('evaluate', 'argument', 'env', 'interpreter', 'value', 'forced')
+
+    def __init__(self, evaluate, argument, env, interpreter):
+        self.evaluate = evaluate  # Interpreter.visit or a compiled closure
+        self.argument = argument  # The node or environment passed to evaluate
+        self.env = env  # Environment of the call site
+        self.interpreter = interpreter
+        self.value = None
+        self.forced = False
+
+    def force(self):
+        """Evaluate the thunk at most once and return its value."""
+        if not self.forced:
+            interpreter = self.interpreter
+            previous_env = interpreter.global_env
+            previous_values = interpreter.cse_values
+            interpreter.global_env = self.env
+            interpreter.cse_values = None
+            self.value = self.evaluate(self.argument)
+            interpreter.global_env = previous_env
+            interpreter.cse_values = previous_values
+            self.forced = True
+            self.evaluate = self.argument = self.env = None
+        return self.value
+
+    def __str__(self):
+        return str(self.value) if self.forced else '<thunk>'
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def is_ready(free_variables, env):
+    """
+    Return True if an argument can be evaluated right away without being observed.
+
+    `free_variables` comes from StrictnessAnalyzer: None for arguments that may
+    print, call functions or fail, otherwise the names the argument reads. The
+    argument is ready when all of them are bound to values that are already
+    computed, so evaluating it now cannot print, fail or force anything.
+    """
+    if free_variables is None:
+        return False
+    for name in free_variables:
+        if name not in env:
+            return False
+        value = env[name]
+        if isinstance(value, Thunk) and not value.forced:
+            return False
+    return True
+
+
+class StrictnessAnalyzer:
+    """
+    Finds the parameters each defun is sure to evaluate.
+
+    A function is strict in a parameter if every evaluation of its body forces
+    that parameter. Passing such an argument eagerly saves allocating a thunk
+    without doing any work the lazy program would skip. The analysis sets:
+
+    - `FunctionDefinition.strict_parameters`, one boolean per parameter,
+    - `FunctionApplication.simple_arguments`, for each argument either None or
+      the variables it reads, when it is a pure expression that cannot fail.
+
+    Eager evaluation is only used for simple arguments (see `is_ready`), so the
+    analysis never changes what a program prints; it only decides where thunks
+    are worth creating. Calls through names that are not stable (see
+    Bindings) are treated as forcing nothing. The analyzer keeps its state
+    between calls to `analyze` so it can be fed one REPL input at a time.
+    """
+
+    def __init__(self):
+        self.functions = []  # Every FunctionDefinition seen so far
+        self.bindings = Bindings()  # How names are bound in everything analyzed so far
+
+    def analyze(self, tree):
+        """Annotate a parsed program with strictness information."""
+        self.bindings.collect(tree)
+        for node in tree:
+            self.collect(node)
+        self.solve()
+
+    def children(self, node):
+        """Return the direct sub-expressions of a node."""
+        if isinstance(node, BinaryOperation):
+            return [node.left, node.right]
+        elif isinstance(node, UnaryOperation):
+            return [node.operand]
+        elif isinstance(node, FunctionDefinition):
+            return list(node.body)
+        elif isinstance(node, LambdaExpression):
+            return [node.body]
+        elif isinstance(node, FunctionApplication):
+            return [node.func] + list(node.arguments)
+        elif isinstance(node, IfStatement):
+            return [node.condition] + list(node.true_block) + list(node.false_block or [])
+        elif isinstance(node, PrintStatement):
+            return [node.expression]
+        return []
+
+    def collect(self, node):
+        """Record function definitions and mark simple arguments."""
+        if isinstance(node, FunctionDefinition):
+            self.functions.append(node)
+        elif isinstance(node, FunctionApplication):
+            node.simple_arguments = [self.free_variables(arg) for arg in node.arguments]
+        for child in self.children(node):
+            self.collect(child)
+
+    def free_variables(self, node):
+        """Return the variables a pure, non-failing expression reads, or None."""
+        if isinstance(node, Literal):
+            return ()
+        elif isinstance(node, Variable):
+            return (node.name,)
+        elif isinstance(node, UnaryOperation):
+            return self.free_variables(node.operand)
+        elif isinstance(node, BinaryOperation):
+            if node.operator.type in (DIV, MOD) and not (isinstance(node.right, Literal) and node.right.value != 0):
+                return None  # May fail with a division by zero
+            left = self.free_variables(node.left)
+            right = self.free_variables(node.right)
+            if left is None or right is None:
+                return None
+            return left + right
+        return None
+
+    def solve(self):
+        """Compute strict parameters for all functions as a greatest fixpoint."""
+        for func in self.functions:
+            func.strict_parameters = [True] * len(func.parameters)
+        changed = True
+        while changed:
+            changed = False
+            for func in self.functions:
+                parameters = {param.value for param in func.parameters}
+                forced = self.forced_in_block(func.body, parameters)
+                strict = [param.value in forced for param in func.parameters]
+                if strict != func.strict_parameters:
+                    func.strict_parameters = strict
+                    changed = True
+
+    def forced_in_block(self, block, parameters):
+        """Return the parameters forced by evaluating every expression of a block."""
+        forced = set()
+        for expr in block:
+            forced |= self.forced_in(expr, parameters)
+        return forced
+
+    def forced_in(self, node, parameters):
+        """Return the parameters that are always forced when `node` is evaluated."""
+        if isinstance(node, Variable):
+            return {node.name} if node.name in parameters else set()
+        elif isinstance(node, BinaryOperation):
+            if node.operator.type in (AND, OR):
+                return self.forced_in(node.left, parameters)  # The right side may be skipped
+            return self.forced_in(node.left, parameters) | self.forced_in(node.right, parameters)
+        elif isinstance(node, UnaryOperation):
+            return self.forced_in(node.operand, parameters)
+        elif isinstance(node, PrintStatement):
+            return self.forced_in(node.expression, parameters)
+        elif isinstance(node, IfStatement):
+            forced = self.forced_in(node.condition, parameters)
+            if node.false_block is not None:
+                forced |= (self.forced_in_block(node.true_block, parameters)
+                           & self.forced_in_block(node.false_block, parameters))
+            return forced
+        elif isinstance(node, FunctionApplication):
+            forced = self.forced_in(node.func, parameters)
+            callee = None
+            if isinstance(node.func, Variable) and node.func.name not in parameters:
+                callee = self.bindings.stable_definition(node.func.name)
+            if callee is not None and len(callee.parameters) == len(node.arguments):
+                for strict, arg in zip(callee.strict_parameters, node.arguments):
+                    if strict:
+                        forced |= self.forced_in(arg, parameters)
+            return forced
+        return set()
@@ -28,6 +28,7 @@ IF = 'IF'
 ELSE = 'ELSE'
 PERIOD = 'PERIOD'
 PRINT = 'PRINT'
+IMPORT = 'IMPORT'
 
 # Token class definition
 class Token:
@@ -50,7 +51,8 @@ class Lexer:
         'else': ELSE,
         'True': BOOLEAN,
         'False': BOOLEAN,
-        'print': PRINT
+        'print': PRINT,
+        'import': IMPORT
     }
 
     def __init__(self, text):
@@ -1,15 +1,22 @@
+import os
 import sys
 from lexer import Lexer
 from parser import Parser
 from interpreter import Interpreter
+from typechecker import TypeChecker
+from modules import ModuleLoader
+from output import choose_output
+from sharing import share_subexpressions
 from repl import REPL
 
-def run_program(file_path):
+def run_program(file_path, lazy=False, share=False):
     """
     Read and execute a program from a given file.
 
     Args:
         file_path (str): Path to the file containing the program to execute.
+        lazy (bool): Pass function arguments by need instead of evaluating them first.
+        share (bool): Share identical subexpressions and compute repeated ones once per call.
     """
     # Check if the file has a .lambda suffix
     if not file_path.endswith('.lambda'):
@@ -23,18 +30,32 @@ def run_program(file_path):
     lexer = Lexer(text)
     parser = Parser(lexer)
     tree = parser.parse()
-    interpreter = Interpreter()
+    TypeChecker().check(tree)  # Report type and arity errors before execution
+    if share:
+        share_subexpressions(tree)
+    # Modules are searched for next to the program first
+    module_loader = ModuleLoader([os.path.dirname(os.path.abspath(file_path))])
+    output = choose_output()  # Block-buffered unless stdout is a terminal
+    interpreter = Interpreter(lazy=lazy, module_loader=module_loader, output=output)
 
     # Interpret the AST and print the result if there is one
-    result = interpreter.interpret(tree)
-    if result is not None:
-        print(result)
+    try:
+        result = interpreter.interpret(tree)
+        if result is not None:
+            output.write(result)
+    finally:
+        output.flush()
 
 if __name__ == '__main__':
+    # '--lazy' selects call-by-need evaluation, '--share' common subexpression sharing
+    lazy = '--lazy' in sys.argv[1:]
+    share = '--share' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg not in ('--lazy', '--share')]
+
     # If a file path is provided as a command-line argument, run the program from the file
-    if len(sys.argv) == 2:
-        run_program(sys.argv[1])
+    if len(args) == 1:
+        run_program(args[0], lazy, share)
     else:
         # Otherwise, start the REPL for interactive use
-        repl = REPL()
+        repl = REPL(lazy, share)
         repl.start()
@@ -0,0 +1,148 @@
+import gc
+import os
+import pickle
+from ast import *
+from lexer import Lexer
+from parser import Parser
+from typechecker import TypeChecker
+
+MODULE_SUFFIX = '.lambda'
+CACHE_DIRECTORY = '__lambdacache__'  # Created next to each module, like __pycache__
+CACHE_VERSION = 1
+SEARCH_PATH_VARIABLE = 'LAMBDA_PATH'  # Extra directories to search, separated by os.pathsep
+
+
+class Module:
+    """A module file, with its exported names and checked AST once they are read."""
+
+    def __init__(self, name, path):
+        self.name = name  # Module name used in the import statement
+        self.path = path  # Path of the .lambda file
+        self.names = None  # Names of the module's top-level defuns
+        self.tree = None  # Parsed and type checked AST
+
+    def __str__(self):
+        return f'Module({self.name}, {self.path})'
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class ModuleLoader:
+    """
+    Finds, parses and caches modules for `import` statements.
+
+    Modules are shared by all loaders of the process, so each file is parsed
+    and type checked at most once per process. The result is also pickled to
+    `__lambdacache__/<name>.pickle` next to the module: a small header with
+    the exported names, followed by the AST. A later process only reads the
+    header until one of the names is actually used.
+    """
+
+    modules = {}  # Path -> Module, shared by every loader
+
+    def __init__(self, search_path=None):
+        self.search_path = list(search_path or [])
+        extra_path = os.environ.get(SEARCH_PATH_VARIABLE)
+        if extra_path:
+            self.search_path.extend(extra_path.split(os.pathsep))
+        self.search_path.append(os.getcwd())
+
+    def error(self, message):
+        """Raise an import error with a custom message."""
+        raise Exception(f'Import error: {message}')
+
+    def find(self, name):
+        """Return the Module for `name` from the first directory of the search path that has it."""
+        for directory in self.search_path:
+            path = os.path.abspath(os.path.join(directory, name + MODULE_SUFFIX))
+            if path in self.modules:
+                return self.modules[path]
+            if os.path.isfile(path):
+                module = Module(name, path)
+                self.modules[path] = module
+                return module
+        self.error(f'Module {name} not found')
+
+    def names(self, module):
+        """Return the names a module exports, reading only the cache header if possible."""
+        if module.names is None:
+            header = self.read_cache(module, header_only=True)
+            if header is None:
+                self.parse(module)
+            else:
+                module.names = header['names']
+        return module.names
+
+    def load(self, module):
+        """Return the checked AST of a module."""
+        if module.tree is None:
+            tree = self.read_cache(module)
+            if tree is None:
+                self.parse(module)
+            else:
+                module.tree = tree
+        return module.tree
+
+    def parse(self, module):
+        """Parse and type check a module, then write it to the cache."""
+        with open(module.path, 'r') as file:
+            text = file.read()
+        type_checker = TypeChecker()
+        try:
+            tree = type_checker.check(Parser(Lexer(text)).parse())
+        except Exception as error:
+            self.error(f'In module {module.name}: {error}')
+        # The importer may bind the same names at runtime, so calls by name keep their arity checks
+        for name in list(type_checker.checked_calls):
+            type_checker.unmark_calls(name)
+
+        module.tree = tree
+        module.names = [node.name.value for node in tree if isinstance(node, FunctionDefinition)]
+        self.write_cache(module)
+
+    def cache_path(self, module):
+        """Return the path of a module's cache file."""
+        directory = os.path.join(os.path.dirname(module.path), CACHE_DIRECTORY)
+        return os.path.join(directory, module.name + '.pickle')
+
+    def source_stamp(self, module):
+        """Return what identifies the current version of a module's source."""
+        stat = os.stat(module.path)
+        return {'version': CACHE_VERSION, 'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def read_cache(self, module, header_only=False):
+        """Return the cached header or AST of a module, or None if the cache is missing or stale."""
+        try:
+            with open(self.cache_path(module), 'rb') as file:
+                header = pickle.load(file)
+                if header.get('stamp') != self.source_stamp(module):
+                    return None
+                if header_only:
+                    return header
+                return self.load_tree(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+    def load_tree(self, file):
+        """Unpickle an AST, pausing the garbage collector, which would otherwise rescan every new node."""
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return pickle.load(file)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def write_cache(self, module):
+        """Write a module's header and AST to its cache file, if the directory is writable."""
+        path = self.cache_path(module)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary_path = f'{path}.{os.getpid()}.tmp'
+            with open(temporary_path, 'wb') as file:
+                pickle.dump({'stamp': self.source_stamp(module), 'names': module.names}, file)
+                pickle.dump(module.tree, file)
+            os.replace(temporary_path, path)
+        except OSError:
+            pass
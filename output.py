@@ -0,0 +1,81 @@
+import sys
+
+# Bytes of output collected by BufferedOutput before it is written out
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class LineBufferedOutput:
+    """
+    Where `print` statements send their values: writes and flushes every line
+    right away, for interactive use. The other outputs build on it.
+
+    `stream` is a text file; None means whatever `sys.stdout` is when the
+    output is written, so redirecting stdout later still works.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def get_stream(self):
+        """Return the stream to write to."""
+        return self.stream if self.stream is not None else sys.stdout
+
+    def write(self, value):
+        """Output a value on a line of its own."""
+        stream = self.get_stream()
+        stream.write(f'{value}\n')
+        stream.flush()
+
+    def flush(self):
+        """Write out anything that is still buffered."""
+        pass
+
+
+class BufferedOutput(LineBufferedOutput):
+    """Collects lines and writes them in blocks of about `buffer_size` characters."""
+
+    def __init__(self, stream=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        super().__init__(stream)
+        self.buffer_size = buffer_size
+        self.lines = []  # Lines waiting to be written
+        self.size = 0  # Characters in self.lines
+
+    def write(self, value):
+        """Output a value on a line of its own."""
+        line = f'{value}\n'
+        self.lines.append(line)
+        self.size += len(line)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write out the buffered lines."""
+        if self.lines:
+            stream = self.get_stream()
+            stream.write(''.join(self.lines))
+            stream.flush()
+            self.lines = []
+            self.size = 0
+
+
+class CaptureOutput(LineBufferedOutput):
+    """Keeps printed values in memory, for batch runs and tests."""
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []  # Printed lines, without line breaks
+
+    def write(self, value):
+        """Keep a value as a line of text."""
+        self.lines.append(str(value))
+
+    def getvalue(self):
+        """Return everything printed so far as one string."""
+        return ''.join(f'{line}\n' for line in self.lines)
+
+
+def choose_output(stream=None):
+    """Return a line-buffered output for terminals and a block-buffered one otherwise, writing to `stream`."""
+    if (stream if stream is not None else sys.stdout).isatty():
+        return LineBufferedOutput(stream)
+    return BufferedOutput(stream)
@@ -103,6 +103,13 @@ class Parser:
             false_block = None
         return IfStatement(condition, true_block, false_block)
 
+    def parse_import_statement(self):
+        """Parse an import statement."""
+        self.eat(IMPORT)
+        module = self.current_token
+        self.eat(IDENTIFIER)
+        return ImportStatement(module)
+
     def parse_factor(self):
         """Parse a factor, the simplest form of an expression."""
         token = self.current_token
@@ -110,6 +117,8 @@ class Parser:
             self.eat(PRINT)
             expr = self.parse_expression()
             return PrintStatement(expr)
+        if token.type == IMPORT:
+            return self.parse_import_statement()
         if token.type == INTEGER:
             self.eat(INTEGER)
             return Literal(token)
@@ -1,15 +1,20 @@
 from lexer import Lexer
 from parser import Parser
 from interpreter import Interpreter
+from typechecker import TypeChecker
+from output import LineBufferedOutput
+from sharing import share_subexpressions
 
 
 class REPL:
     """Read-Eval-Print Loop (REPL) for the Functional Language Interpreter."""
 
-    def __init__(self):
+    def __init__(self, lazy=False, share=False):
         self.lexer = None
         self.parser = None
-        self.interpreter = Interpreter()
+        self.interpreter = Interpreter(lazy=lazy, output=LineBufferedOutput())
+        self.type_checker = TypeChecker()
+        self.share = share  # Share common subexpressions of each input
 
     def start(self):
         """Start the REPL session."""
@@ -37,6 +42,9 @@ class REPL:
                     self.lexer = Lexer(buffer.strip())
                     self.parser = Parser(self.lexer)
                     tree = self.parser.parse()
+                    self.type_checker.check(tree)
+                    if self.share:
+                        share_subexpressions(tree)
                     result = self.interpreter.interpret(tree)
 
                     # Print the result if it is not None
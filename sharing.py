@@ -0,0 +1,182 @@
+import sys
+from ast import *
+from lexer import Token
+
+
+class HashConser:
+    """
+    Shares structurally identical pure subtrees of an AST.
+
+    Literals, variables and operations on them are looked up in a table keyed
+    by their structure, with children compared by identity once they have been
+    shared themselves. Every occurrence of the same expression then refers to
+    one node object. Other nodes are kept as they are, but their children are
+    shared. Run it after the TypeChecker. The shared node keeps the `fast_op`
+    of its first occurrence, which is correct for all of them because it
+    computes what the generic operators would. Its `inferred_type` is kept
+    only if all the occurrences agree on it: the same variable name can have
+    a different type in each function, so it is cleared otherwise.
+    """
+
+    def __init__(self):
+        self.table = {}  # Structure -> shared node
+
+    def share(self, tree):
+        """Share the subtrees of a list of top-level nodes in place and return it."""
+        tree[:] = [self.share_node(node) for node in tree]
+        return tree
+
+    def share_node(self, node):
+        """Return the shared node for a node, after sharing its children."""
+        if isinstance(node, BinaryOperation):
+            node.left = self.share_node(node.left)
+            node.right = self.share_node(node.right)
+            key = ('BinaryOperation', node.operator.type, node.left, node.right)
+        elif isinstance(node, UnaryOperation):
+            node.operand = self.share_node(node.operand)
+            key = ('UnaryOperation', node.operator.type, node.operand)
+        elif isinstance(node, Literal):
+            key = ('Literal', type(node.value), node.value)  # Keep True apart from 1
+        elif isinstance(node, Variable):
+            key = ('Variable', node.name)
+        else:
+            self.share_children(node)
+            return node
+        shared = self.table.setdefault(key, node)
+        if shared.inferred_type != node.inferred_type:
+            shared.inferred_type = None  # The occurrences have different types
+        return shared
+
+    def share_children(self, node):
+        """Share the children of a node that is not shared itself."""
+        if isinstance(node, FunctionDefinition):
+            node.body = [self.share_node(expr) for expr in node.body]
+        elif isinstance(node, LambdaExpression):
+            node.body = self.share_node(node.body)
+        elif isinstance(node, FunctionApplication):
+            node.func = self.share_node(node.func)
+            node.arguments = [self.share_node(arg) for arg in node.arguments]
+        elif isinstance(node, IfStatement):
+            node.condition = self.share_node(node.condition)
+            node.true_block = [self.share_node(expr) for expr in node.true_block]
+            if node.false_block:
+                node.false_block = [self.share_node(expr) for expr in node.false_block]
+        elif isinstance(node, PrintStatement):
+            node.expression = self.share_node(node.expression)
+
+
+class CommonSubexpressions:
+    """
+    Finds the pure operations that a function or lambda body evaluates more than once.
+
+    An operation is pure when it only reads variables and literals, so within
+    one call of a body, where the environment does not change, it always has
+    the same value. Such operations occurring twice in a body (its if blocks
+    included, nested lambdas excluded) are marked `common`, and the body is
+    marked `caches_common`: each call then keeps the values of its common
+    operations and computes each of them once. Bodies that define functions
+    change their environment and are left alone. The pass relies on
+    HashConser, since it compares nodes by identity.
+    """
+
+    def __init__(self):
+        self.pure = {}  # Node -> whether it is pure
+
+    def mark(self, tree):
+        """Mark the common operations of every function and lambda body in a list of nodes."""
+        for node in tree:
+            self.visit(node, None)
+
+    def visit(self, node, scope):
+        """
+        Count the occurrences of pure operations below a node.
+
+        `scope` holds the counts of the enclosing body, or is None at the top
+        level; its 'defines' entry is set when the body defines a function.
+        """
+        if isinstance(node, (BinaryOperation, UnaryOperation)):
+            if self.is_pure(node):
+                if scope is None:
+                    return
+                scope['counts'][node] = scope['counts'].get(node, 0) + 1
+                if scope['counts'][node] > 1:
+                    return  # Its parts were counted with its first occurrence
+            # Operations on calls are not counted, but their operands still are
+            children = [node.left, node.right] if isinstance(node, BinaryOperation) else [node.operand]
+        elif isinstance(node, FunctionDefinition):
+            if scope is not None:
+                scope['defines'] = True
+            self.mark_body(node, node.body)
+            return
+        elif isinstance(node, LambdaExpression):
+            self.mark_body(node, [node.body])
+            return
+        elif isinstance(node, FunctionApplication):
+            children = [node.func] + node.arguments
+        elif isinstance(node, IfStatement):
+            children = [node.condition] + node.true_block + (node.false_block or [])
+        elif isinstance(node, PrintStatement):
+            children = [node.expression]
+        else:
+            return
+        for child in children:
+            self.visit(child, scope)
+
+    def mark_body(self, owner, body):
+        """Mark the common operations of the body of a function or lambda."""
+        scope = {'counts': {}, 'defines': False}
+        for expr in body:
+            self.visit(expr, scope)
+        if scope['defines']:
+            return
+        for node, count in scope['counts'].items():
+            if count > 1:
+                node.common = True
+                owner.caches_common = True
+
+    def is_pure(self, node):
+        """Return True if a node only reads variables and literals."""
+        if node not in self.pure:
+            if isinstance(node, BinaryOperation):
+                self.pure[node] = self.is_pure(node.left) and self.is_pure(node.right)
+            elif isinstance(node, UnaryOperation):
+                self.pure[node] = self.is_pure(node.operand)
+            else:
+                self.pure[node] = isinstance(node, (Literal, Variable))
+        return self.pure[node]
+
+
+def share_subexpressions(tree):
+    """Hash-cons a checked tree and mark its common subexpressions; returns the tree."""
+    HashConser().share(tree)
+    CommonSubexpressions().mark(tree)
+    return tree
+
+
+def tree_size(tree):
+    """
+    Return the size of a list of top-level nodes as a dict.
+
+    'occurrences' counts every node as the tree is walked, 'nodes' counts
+    distinct node objects, and 'bytes' adds up the memory of those nodes, their
+    attribute dicts and the tokens they hold.
+    """
+    seen = set()
+    size = {'occurrences': 0, 'nodes': 0, 'bytes': 0}
+    stack = list(tree)
+    while stack:
+        node = stack.pop()
+        size['occurrences'] += 1
+        first = id(node) not in seen
+        if first:
+            seen.add(id(node))
+            size['nodes'] += 1
+            size['bytes'] += sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+        for value in node.__dict__.values():
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, AST):
+                    stack.append(item)  # Shared children are walked again for each occurrence
+                elif first and isinstance(item, Token) and id(item) not in seen:
+                    seen.add(id(item))
+                    size['bytes'] += sys.getsizeof(item) + sys.getsizeof(item.__dict__)
+    return size
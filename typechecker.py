@@ -0,0 +1,373 @@
+from collections import ChainMap
+from ast import *
+from lexer import *
+import operator
+
+# Concrete types of the language
+INT_TYPE = 'int'
+BOOL_TYPE = 'bool'
+UNIT_TYPE = 'unit'  # Result of print statements and definitions
+
+# Integer operations that can run without the generic operator dispatch
+INTEGER_OPERATIONS = {
+    PLUS: operator.add,
+    MINUS: operator.sub,
+    MUL: operator.mul,
+    DIV: operator.floordiv,
+    MOD: operator.mod,
+    EQ: operator.eq,
+    NEQ: operator.ne,
+    GT: operator.gt,
+    LT: operator.lt,
+    GTE: operator.ge,
+    LTE: operator.le,
+}
+
+ARITHMETIC_OPERATORS = (PLUS, MINUS, MUL, DIV, MOD)
+COMPARISON_OPERATORS = (GT, LT, GTE, LTE)
+EQUALITY_OPERATORS = (EQ, NEQ)
+LOGICAL_OPERATORS = (AND, OR)
+
+
+class TypeVariable:
+    """A type that is not known yet and may be bound during unification."""
+
+    _next_id = 0
+
+    def __init__(self):
+        self.instance = None  # The type this variable has been bound to
+        self.id = TypeVariable._next_id
+        TypeVariable._next_id += 1
+
+    def __str__(self):
+        if self.instance is not None:
+            return str(self.instance)
+        return f't{self.id}'
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class FunctionType:
+    """The type of a function or lambda: parameter types and a result type."""
+
+    def __init__(self, parameters, result):
+        self.parameters = parameters  # List of parameter types
+        self.result = result  # Result type
+
+    def __str__(self):
+        params_str = ", ".join(str(param) for param in self.parameters)
+        return f'({params_str}) -> {self.result}'
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class Bindings:
+    """
+    Records how names are bound, to tell which calls by name always reach the same defun.
+
+    A name is stable when exactly one `defun` binds it, no parameter uses it
+    and there are no imports (a module may bind the name when the defun is
+    not run). The TypeChecker and the StrictnessAnalyzer both rely on this
+    rule. Programs can be added one at a time, as the REPL does; a name that
+    was stable can stop being stable, but not the other way around.
+    """
+
+    def __init__(self):
+        self.definitions = {}  # Name -> FunctionDefinitions binding it
+        self.parameter_names = set()  # Names bound as parameters anywhere
+        self.has_imports = False  # Set once an import is seen
+
+    def collect(self, nodes):
+        """Record the defuns, parameters and imports in a list of nodes."""
+        for node in nodes:
+            self.collect_node(node)
+
+    def collect_node(self, node):
+        """Recursive helper for collect."""
+        if isinstance(node, FunctionDefinition):
+            self.definitions.setdefault(node.name.value, []).append(node)
+            self.parameter_names.update(param.value for param in node.parameters)
+            self.collect(node.body)
+        elif isinstance(node, LambdaExpression):
+            self.parameter_names.update(param.value for param in node.parameters)
+            self.collect_node(node.body)
+        elif isinstance(node, BinaryOperation):
+            self.collect_node(node.left)
+            self.collect_node(node.right)
+        elif isinstance(node, UnaryOperation):
+            self.collect_node(node.operand)
+        elif isinstance(node, FunctionApplication):
+            self.collect_node(node.func)
+            self.collect(node.arguments)
+        elif isinstance(node, IfStatement):
+            self.collect_node(node.condition)
+            self.collect(node.true_block)
+            self.collect(node.false_block or [])
+        elif isinstance(node, PrintStatement):
+            self.collect_node(node.expression)
+        elif isinstance(node, ImportStatement):
+            self.has_imports = True
+
+    def stable_definition(self, name):
+        """Return the one defun a name can be bound to, or None if it is not stable."""
+        definitions = self.definitions.get(name, [])
+        if len(definitions) == 1 and name not in self.parameter_names and not self.has_imports:
+            return definitions[0]
+        return None
+
+
+class TypeChecker:
+    """
+    Static pass that infers int/bool types and checks call arities before execution.
+
+    Types are inferred by unification, with let-polymorphism for `defun`s so the
+    same function can be used at different types. Besides reporting errors, the
+    pass annotates the AST for the interpreter:
+
+    - every node gets an `inferred_type` (INT_TYPE, BOOL_TYPE, UNIT_TYPE or None),
+    - a BinaryOperation on two integers gets a `fast_op` to call directly,
+    - a FunctionApplication (and a directly applied LambdaExpression) whose arity
+      is statically known to match gets `arity_checked = True`.
+
+    Arity is only trusted for callees whose binding cannot change at runtime,
+    the stable names of `Bindings`. The checker keeps its state between calls
+    to `check`, so the REPL can feed it one input at a time; a name that stops
+    being stable later has its earlier marks dropped.
+    """
+
+    def __init__(self):
+        self.env = {}  # Name -> type for the current scope
+        self.non_generic = set()  # Type variables that must not be generalized
+        self.bindings = Bindings()  # How names are bound in everything checked so far
+        self.checked_calls = {}  # Name -> applications marked arity_checked
+        self.annotated = []  # Nodes whose inferred_type is resolved at the end
+
+    def error(self, message):
+        """Raise a type error with a custom message."""
+        raise Exception(f'Type error: {message}')
+
+    def check(self, tree):
+        """Check a parsed program and annotate it. Returns the tree."""
+        self.bindings.collect(tree)
+        for name in list(self.checked_calls):
+            if self.bindings.stable_definition(name) is None:
+                self.unmark_calls(name)  # Redefined, shadowed or possibly imported
+        self.annotated = []
+        for node in tree:
+            self.visit(node)
+        for node in self.annotated:
+            self.annotate(node)
+        self.annotated = []
+        return tree
+
+    def unmark_calls(self, name):
+        """Restore runtime arity checks on calls to a name that is no longer stable."""
+        for node in self.checked_calls.pop(name, []):
+            node.arity_checked = False
+
+    def prune(self, type_):
+        """Follow bound type variables to the type they stand for."""
+        while isinstance(type_, TypeVariable) and type_.instance is not None:
+            type_ = type_.instance
+        return type_
+
+    def occurs_in(self, variable, type_):
+        """Return True if `variable` occurs inside `type_`."""
+        type_ = self.prune(type_)
+        if type_ is variable:
+            return True
+        if isinstance(type_, FunctionType):
+            return any(self.occurs_in(variable, t) for t in type_.parameters + [type_.result])
+        return False
+
+    def unify(self, first, second, node):
+        """Make two types equal, or report a type error at `node`."""
+        first = self.prune(first)
+        second = self.prune(second)
+        if first is second:
+            return
+        if isinstance(first, TypeVariable):
+            if self.occurs_in(first, second):
+                self.error(f'Recursive type in {node}')
+            first.instance = second
+        elif isinstance(second, TypeVariable):
+            self.unify(second, first, node)
+        elif isinstance(first, FunctionType) and isinstance(second, FunctionType):
+            if len(first.parameters) != len(second.parameters):
+                self.error(f'Function expected {len(first.parameters)} arguments, '
+                           f'got {len(second.parameters)} in {node}')
+            for first_param, second_param in zip(first.parameters, second.parameters):
+                self.unify(first_param, second_param, node)
+            self.unify(first.result, second.result, node)
+        elif first != second:
+            self.error(f'Expected {first}, got {second} in {node}')
+
+    def fresh(self, type_, mapping=None):
+        """Instantiate a polymorphic type with new variables for its generic parts."""
+        if mapping is None:
+            mapping = {}
+        type_ = self.prune(type_)
+        if isinstance(type_, TypeVariable):
+            if any(self.occurs_in(type_, t) for t in self.non_generic):
+                return type_
+            if type_ not in mapping:
+                mapping[type_] = TypeVariable()
+            return mapping[type_]
+        if isinstance(type_, FunctionType):
+            return FunctionType([self.fresh(t, mapping) for t in type_.parameters],
+                                self.fresh(type_.result, mapping))
+        return type_
+
+    def visit(self, node):
+        """Infer the type of a node and remember it for annotation."""
+        method_name = 'visit_' + type(node).__name__
+        visitor = getattr(self, method_name, self.generic_visit)
+        node.inferred_type = visitor(node)
+        self.annotated.append(node)
+        return node.inferred_type
+
+    def generic_visit(self, node):
+        """Fallback method if no explicit visit function is found."""
+        self.error(f'No visit_{type(node).__name__} method')
+
+    def visit_block(self, block):
+        """Infer the type of a list of expressions (the type of the last one)."""
+        result = UNIT_TYPE
+        for expr in block:
+            result = self.visit(expr)
+        return result
+
+    def visit_scope(self, parameters, body_visitor):
+        """Bind parameters to new type variables and infer a body within that scope."""
+        param_types = [TypeVariable() for _ in parameters]
+        previous_env = self.env
+        previous_non_generic = self.non_generic
+        self.env = ChainMap({param.value: t for param, t in zip(parameters, param_types)}, self.env)
+        self.non_generic = self.non_generic | set(param_types)
+        try:
+            result = body_visitor()
+        finally:
+            self.env = previous_env
+            self.non_generic = previous_non_generic
+        return param_types, result
+
+    def visit_BinaryOperation(self, node):
+        """Infer the type of a binary operation."""
+        left_type = self.visit(node.left)
+        right_type = self.visit(node.right)
+        operator = node.operator.type
+
+        if operator in ARITHMETIC_OPERATORS:
+            self.unify(INT_TYPE, left_type, node)
+            self.unify(INT_TYPE, right_type, node)
+            return INT_TYPE
+        elif operator in COMPARISON_OPERATORS:
+            self.unify(INT_TYPE, left_type, node)
+            self.unify(INT_TYPE, right_type, node)
+            return BOOL_TYPE
+        elif operator in EQUALITY_OPERATORS:
+            self.unify(left_type, right_type, node)
+            return BOOL_TYPE
+        elif operator in LOGICAL_OPERATORS:
+            self.unify(BOOL_TYPE, left_type, node)
+            self.unify(BOOL_TYPE, right_type, node)
+            return BOOL_TYPE
+        self.error(f'Unknown operator {node.operator.value}')
+
+    def visit_UnaryOperation(self, node):
+        """Infer the type of a unary operation."""
+        operand_type = self.visit(node.operand)
+        if node.operator.type == NOT:
+            self.unify(BOOL_TYPE, operand_type, node)
+            return BOOL_TYPE
+        self.error(f'Unknown operator {node.operator.value}')
+
+    def visit_Literal(self, node):
+        """Literals are either booleans or integers."""
+        return BOOL_TYPE if isinstance(node.value, bool) else INT_TYPE
+
+    def visit_Variable(self, node):
+        """
+        Look up the type of a variable.
+
+        Scoping is dynamic at runtime, so a name the checker cannot see here may
+        still be bound by a caller; such names get an unconstrained type.
+        """
+        if node.name in self.env:
+            return self.fresh(self.env[node.name])
+        return TypeVariable()
+
+    def visit_FunctionDefinition(self, node):
+        """Infer a function's type and bind it, generalized, in the current scope."""
+        function_type = TypeVariable()
+        self.env[node.name.value] = function_type
+        previous_non_generic = self.non_generic
+        self.non_generic = self.non_generic | {function_type}  # Recursion is monomorphic
+        try:
+            param_types, result = self.visit_scope(node.parameters, lambda: self.visit_block(node.body))
+        finally:
+            self.non_generic = previous_non_generic
+        self.unify(function_type, FunctionType(param_types, result), node)
+        return UNIT_TYPE
+
+    def visit_LambdaExpression(self, node):
+        """Infer the type of a lambda expression."""
+        param_types, result = self.visit_scope(node.parameters, lambda: self.visit(node.body))
+        return FunctionType(param_types, result)
+
+    def visit_FunctionApplication(self, node):
+        """Check the arity of an application and infer its result type."""
+        func_type = self.prune(self.visit(node.func))
+        arg_types = [self.visit(arg) for arg in node.arguments]
+        if isinstance(func_type, FunctionType) and len(func_type.parameters) != len(arg_types):
+            self.error(f'{node.func} expected {len(func_type.parameters)} arguments, got {len(arg_types)}')
+
+        result = TypeVariable()
+        self.unify(func_type, FunctionType(arg_types, result), node)
+
+        if isinstance(node.func, LambdaExpression):
+            # The lambda is created and called right here, so it cannot be called elsewhere
+            node.arity_checked = True
+            node.func.arity_checked = True
+        elif (isinstance(node.func, Variable) and isinstance(func_type, FunctionType)
+              and self.bindings.stable_definition(node.func.name) is not None):
+            node.arity_checked = True
+            self.checked_calls.setdefault(node.func.name, []).append(node)
+        return result
+
+    def visit_IfStatement(self, node):
+        """Infer the type of an if-else statement."""
+        self.unify(BOOL_TYPE, self.visit(node.condition), node)
+        true_type = self.visit_block(node.true_block)
+        if node.false_block is None:
+            return TypeVariable()  # Either the true block's value or nothing
+        false_type = self.visit_block(node.false_block)
+        self.unify(true_type, false_type, node)
+        return true_type
+
+    def visit_ImportStatement(self, node):
+        """Imported names are only known at runtime, so an import adds no types."""
+        return UNIT_TYPE
+
+    def visit_PrintStatement(self, node):
+        """A print statement evaluates its expression and returns nothing."""
+        self.visit(node.expression)
+        return UNIT_TYPE
+
+    def annotate(self, node):
+        """Replace a node's inferred type with its final value and set its fast path."""
+        inferred_type = self.prune(node.inferred_type)
+        node.inferred_type = inferred_type if isinstance(inferred_type, str) else None
+
+        if isinstance(node, BinaryOperation):
+            node.fast_op = None
+            operator = node.operator.type
+            if operator not in INTEGER_OPERATIONS:
+                return
+            if self.prune(node.left.inferred_type) != INT_TYPE or self.prune(node.right.inferred_type) != INT_TYPE:
+                return
+            if operator in (DIV, MOD) and not (isinstance(node.right, Literal) and node.right.value != 0):
+                return  # Keep the runtime zero check
+            node.fast_op = INTEGER_OPERATIONS[operator]